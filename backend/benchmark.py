@@ -0,0 +1,154 @@
+"""Benchmark the resume pipeline across routing profiles or step 7 assemblers.
+
+Usage:
+    python benchmark.py --resume resume.txt --job job.txt \
+        --config step_profiles.example.json
+    python benchmark.py --compare-assembly --resume fixtures/resume_*.txt \
+        --job fixtures/job.txt
+
+By default the pipeline runs against the bundled stub (stub_server.py) on a free
+local port. --base-url points it at another OpenAI-compatible endpoint and --live
+uses the real API.
+"""
+import argparse
+import asyncio
+import difflib
+import os
+import re
+import time
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resume", required=True, nargs="+", help="Path(s) to resume .txt")
+    parser.add_argument("--job", required=True, help="Path to job description .txt")
+    parser.add_argument("--config", help="JSON file with 'profiles'")
+    parser.add_argument("--profiles", nargs="*", help="Subset of profiles to run")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per profile")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="OpenAI-compatible endpoint instead of the bundled stub")
+    target.add_argument("--live", action="store_true", help="Use the real OpenAI API")
+    parser.add_argument(
+        "--compare-assembly",
+        action="store_true",
+        help="Compare local vs LLM step 7 assembly instead of routing profiles",
+    )
+    args = parser.parse_args()
+    if not args.compare_assembly and not args.config:
+        parser.error("--config is required unless --compare-assembly is set")
+    return args
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        return fh.read()
+
+
+async def _timed_run(main, resume_text, job_text, **kwargs):
+    stats = []
+    started = time.perf_counter()
+    result = await main._run_resume_pipeline(resume_text, job_text, stats=stats, **kwargs)
+    return result["content"], stats, time.perf_counter() - started
+
+
+def _print_stats(stats):
+    for s in stats:
+        print(
+            f"    {s['step']:<16}{s['model']:<16}{s['seconds']:>8.2f}s"
+            f"{s['prompt_tokens']:>10}{s['completion_tokens']:>10}"
+        )
+
+
+def _policy_issues(main, text, original):
+    """Section-policy problems a reviewer would flag in a final resume."""
+    issues = []
+    presence = main._original_section_presence(text)
+    expected = main._original_section_presence(original)
+    for hdr in ("SUMMARY", "SKILLS", "EXPERIENCE", "EDUCATION"):
+        if not presence[hdr]:
+            issues.append(f"missing {hdr}")
+    for hdr in ("CERTIFICATIONS", "PROJECTS"):
+        if presence[hdr] != expected[hdr]:
+            issues.append(f"{hdr} {'added' if presence[hdr] else 'dropped'}")
+    if re.search(r"(?i)available\s+upon\s+request", text):
+        issues.append("placeholder text")
+    return issues
+
+
+async def _bench_profiles(main, args):
+    from step_config import list_profiles, load_step_configs
+
+    job_text = _read(args.job)
+    profiles = args.profiles or list_profiles(args.config)
+    print(f"{'profile':<16}{'run':>4}{'seconds':>10}{'tokens in':>12}{'tokens out':>12}")
+    for resume_path in args.resume:
+        resume_text = _read(resume_path)
+        print(resume_path)
+        for profile in profiles:
+            configs = load_step_configs(args.config, profile)
+            for run in range(1, args.runs + 1):
+                _, stats, elapsed = await _timed_run(
+                    main, resume_text, job_text, step_configs=configs
+                )
+                tokens_in = sum(s["prompt_tokens"] for s in stats)
+                tokens_out = sum(s["completion_tokens"] for s in stats)
+                print(f"{profile:<16}{run:>4}{elapsed:>10.2f}{tokens_in:>12}{tokens_out:>12}")
+                _print_stats(stats)
+
+
+async def _compare_assembly(main, args):
+    job_text = _read(args.job)
+    for resume_path in args.resume:
+        resume_text = _read(resume_path)
+        outputs = {}
+        for mode in ("llm", "local"):
+            content, stats, elapsed = await _timed_run(
+                main, resume_text, job_text, assembler=mode
+            )
+            outputs[mode] = content
+            calls = sum(1 for s in stats if s["model"] != "local")
+            tokens = sum(s["prompt_tokens"] + s["completion_tokens"] for s in stats)
+            issues = _policy_issues(main, content, resume_text)
+            print(
+                f"{resume_path} [{mode}] {elapsed:.2f}s | calls={calls} | tokens={tokens} | "
+                f"policy={'ok' if not issues else ', '.join(issues)}"
+            )
+            _print_stats(stats)
+        ratio = difflib.SequenceMatcher(None, outputs["llm"], outputs["local"]).ratio()
+        print(f"  similarity llm vs local: {ratio:.2%}")
+        for line in difflib.unified_diff(
+            outputs["llm"].splitlines(),
+            outputs["local"].splitlines(),
+            "llm",
+            "local",
+            lineterm="",
+        ):
+            print(f"  {line}")
+
+
+async def _bench(args):
+    # Import after env setup so the module-level client picks up the base URL
+    import main
+
+    if args.compare_assembly:
+        await _compare_assembly(main, args)
+    else:
+        await _bench_profiles(main, args)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.live:
+        asyncio.run(_bench(args))
+    elif args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        asyncio.run(_bench(args))
+    else:
+        from stub_server import BackgroundStub
+
+        with BackgroundStub() as stub:
+            os.environ["OPENAI_BASE_URL"] = stub.base_url
+            os.environ.setdefault("OPENAI_API_KEY", "stub")
+            print(f"Using stub at {stub.base_url}")
+            asyncio.run(_bench(args))
@@ -1,27 +1,67 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Form, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Dict, Optional, List
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+import asyncio
+import codecs
 import httpx
 import logging
 import uuid
 import os
 from pydantic import BaseModel
+from dataclasses import dataclass, replace
 import re
 import tempfile
+import time
 from markitdown import MarkItDown
 
-from openai import AsyncOpenAI
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+from openai_client import (
+    ConnectionStats,
+    PoolSettings,
+    build_openai_client,
+    keep_warm,
+    warm_up,
+)
 from prompts import ResumePrompts
+from step_config import StepConfig, load_step_configs
 
 # --- Load environment ---
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-# --- Setup OpenAI Client ---
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# --- Job page fetch limits ---
+JOB_FETCH_MAX_BYTES = int(os.getenv("JOB_FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+JOB_FETCH_TIMEOUT = float(os.getenv("JOB_FETCH_TIMEOUT", "20"))
+
+# --- Setup OpenAI Client (built in the lifespan hook, or lazily outside the app) ---
+POOL_SETTINGS = PoolSettings.from_env()
+connection_stats = ConnectionStats()
+client: Optional[AsyncOpenAI] = None
+
+def get_openai_client() -> AsyncOpenAI:
+    global client
+    if client is None:
+        client = build_openai_client(OPENAI_API_KEY, connection_stats, POOL_SETTINGS)
+    return client
+
+# --- Step 7 assembler: "local" joins sections deterministically, "llm" uses a model call ---
+RESUME_ASSEMBLER = os.getenv("RESUME_ASSEMBLER", "local").strip().lower() or "local"
+# How step 7 was actually assembled: "local", "llm" (by choice) or "llm_fallback"
+ASSEMBLY_COUNTS: Dict[str, int] = {"local": 0, "llm": 0, "llm_fallback": 0}
+
+# --- Per-step model routing (model, token cap, reasoning effort) ---
+STEP_CONFIGS: Dict[str, StepConfig] = load_step_configs()
 
 # --- Configure Logging ---
 logging.basicConfig(
@@ -32,7 +72,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # --- FastAPI App ---
-app = FastAPI(title="ResumeTuner")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client
+    client = build_openai_client(OPENAI_API_KEY, connection_stats, POOL_SETTINGS)
+    await warm_up(client, POOL_SETTINGS.warm_connections)
+    watcher = None
+    if POOL_SETTINGS.rewarm_after > 0:
+        watcher = asyncio.create_task(keep_warm(client, connection_stats, POOL_SETTINGS))
+    try:
+        yield
+    finally:
+        if watcher:
+            watcher.cancel()
+        logger.info(f"OpenAI connection stats | {connection_stats.as_dict()}")
+        await client.close()
+        client = None
+
+app = FastAPI(title="ResumeTuner", lifespan=lifespan)
 
 def get_origin_header(request: Request):
     return request.headers.get("origin")
@@ -55,10 +112,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Resume-Degraded"],
 )
 
-# --- In-Memory File Store ---
-memory_store: Dict[str, str] = {}
+# --- In-Memory File Store (file_id -> parsed resume, see ParsedResume) ---
+memory_store: Dict[str, "ParsedResume"] = {}
 
 
 # --- Section Handling Utilities ---
@@ -90,8 +148,9 @@ SECTION_ALIASES = {
 
 def _canon_header(line: str) -> Optional[str]:
     name = re.sub(r"\s+", " ", (line or "").strip()).upper()
-    if name.endswith(":"):
-        name = name[:-1]
+    # Tolerate Markdown headings such as "## Summary", "**Skills**" or "**Experience:**"
+    name = re.sub(r"^#{1,6}\s*", "", name)
+    name = name.strip("*_ ").rstrip(":").strip("*_ ")
     return SECTION_ALIASES.get(name)
 
 def _normalize_headers(text: str) -> str:
@@ -162,7 +221,28 @@ def _original_section_presence(text: str) -> Dict[str, bool]:
         present[hdr] = True
     return present
 
-def enforce_section_policies(final_text: str, original_text: str) -> str:
+@dataclass(frozen=True)
+class ParsedResume:
+    """Resume text plus the parse the pipeline needs, computed once per upload."""
+    raw: str  # as uploaded, returned unchanged by /file/{file_id}
+    text: str
+    preamble: str
+    sections: List[tuple[str, List[str]]]
+    presence: Dict[str, bool]
+
+def parse_resume(text: str) -> ParsedResume:
+    normalized = (text or "").lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+    pre, secs = _split_into_sections(_normalize_headers(normalized))
+    present = {h: False for h in CANONICAL_HEADERS}
+    for hdr, _ in secs:
+        present[hdr] = True
+    return ParsedResume(raw=text or "", text=normalized, preamble=pre, sections=secs, presence=present)
+
+def enforce_section_policies(
+    final_text: str,
+    original_text: str,
+    orig_presence: Optional[Dict[str, bool]] = None,
+) -> str:
     """Enforce mandatory and conditional section rules deterministically.
     - Always include SUMMARY, SKILLS, EXPERIENCE, EDUCATION
     - Include CERTIFICATIONS/PROJECTS only if present in original
@@ -188,7 +268,8 @@ def enforce_section_policies(final_text: str, original_text: str) -> str:
             ordered.append((hdr, body[:]))
             seen.add(hdr)
 
-    orig_presence = _original_section_presence(original_text or "")
+    if orig_presence is None:
+        orig_presence = _original_section_presence(original_text or "")
 
     # Remove conditional sections if not present originally
     filtered: List[tuple[str, List[str]]] = []
@@ -213,6 +294,84 @@ def enforce_section_policies(final_text: str, original_text: str) -> str:
     return _join_sections(pre, filtered)
 
 
+def _section_body(text: str, header: str) -> List[str]:
+    _, secs = _split_into_sections(_normalize_headers(text or ""))
+    for hdr, body in secs:
+        if hdr == header:
+            return body
+    return []
+
+_CHATTER_RE = re.compile(
+    r"(?i)^\s*(here(?:'s| is| are)\b|below (?:is|are)\b|sure[,.!]|certainly[,.!]|of course[,.!]|"
+    r"let me know\b|i hope\b|feel free\b)"
+)
+
+def _plain_lines(lines: List[str]) -> List[str]:
+    """Strip model chatter and Markdown so step output can be used verbatim.
+    Chatter is only dropped before the first and after the last content line.
+    """
+    out: List[str] = []
+    for ln in lines:
+        if re.fullmatch(r"\s*(?:-{3,}|\*{3,}|_{3,}|```\w*)\s*", ln):
+            continue
+        ln = re.sub(r"^(\s*)#{1,6}\s+", r"\1", ln)
+        ln = re.sub(r"^(\s*)[*•]\s+", r"\1- ", ln)
+        ln = re.sub(r"\*\*(?=\S)(.+?)(?<=\S)\*\*", r"\1", ln)
+        # "__" only as a whole-line wrapper, so inline identifiers like __init__ survive
+        ln = re.sub(r"^(\s*)__(?=\S)(.*?\S)__\s*$", r"\1\2", ln)
+        out.append(ln.rstrip())
+    while out and (not out[0].strip() or _CHATTER_RE.match(out[0])):
+        out.pop(0)
+    while out and (not out[-1].strip() or _CHATTER_RE.match(out[-1])):
+        out.pop()
+    return out
+
+def _entry_lines(entries: str) -> List[str]:
+    return [ln for ln in _plain_lines((entries or "").splitlines()) if ln.strip()]
+
+def assemble_resume_locally(
+    original: ParsedResume,
+    summary_skills: str,
+    experience_section: str,
+    education_entries: str,
+    certifications_entries: str,
+) -> Optional[str]:
+    """Assemble the step 7 resume from earlier step outputs without a model call.
+    - Preamble (name/contact) and PROJECTS come from the original resume
+    - SUMMARY/SKILLS from the summary step, EXPERIENCE from the experience step
+    - EDUCATION/CERTIFICATIONS entries only if present in original
+    Returns None when a required rewritten section is missing so callers can fall back.
+    """
+    orig_presence = original.presence
+
+    summary = _plain_lines(_section_body(summary_skills, "SUMMARY"))
+    skills = _plain_lines(_section_body(summary_skills, "SKILLS"))
+    exp_pre, exp_secs = _split_into_sections(_normalize_headers(experience_section or ""))
+    # Experience step may return bare entries without the header
+    experience = _plain_lines(
+        _section_body(experience_section, "EXPERIENCE") if exp_secs else exp_pre.splitlines()
+    )
+    if not all("\n".join(body).strip() for body in (summary, skills, experience)):
+        return None
+
+    sections: List[tuple[str, List[str]]] = [
+        ("SUMMARY", summary),
+        ("SKILLS", skills),
+        ("EXPERIENCE", experience),
+    ]
+    if orig_presence.get("PROJECTS"):
+        # Copy so the cached parse is never shared with (or mutated through) the output
+        projects = next(body for hdr, body in original.sections if hdr == "PROJECTS")
+        sections.append(("PROJECTS", list(projects)))
+    sections.append(
+        ("EDUCATION", _entry_lines(education_entries) if orig_presence.get("EDUCATION") else [])
+    )
+    if orig_presence.get("CERTIFICATIONS"):
+        sections.append(("CERTIFICATIONS", _entry_lines(certifications_entries)))
+
+    return _join_sections(original.preamble, sections)
+
+
 # --- Utility to extract job description from HTML ---
 def extract_job_text_flexibly(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
@@ -233,6 +392,117 @@ def extract_job_text_flexibly(html: str) -> str:
     raise ValueError("Could not reliably extract job description from HTML.")
 
 
+JOB_BODY_TESTID = "job-detail-page__job-body"
+
+
+class _StreamingJobHTMLFilter(HTMLParser):
+    """Incrementally re-emit HTML without <script>/<style> content or comments.
+    Sets `done` once the known job-body container has been closed.
+    """
+
+    _SKIP_TAGS = ("script", "style")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts: List[str] = []
+        self.done = False
+        self._skip_tag: Optional[str] = None
+        self._body_tag: Optional[str] = None
+        self._body_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.done or self._skip_tag:
+            return
+        if tag in self._SKIP_TAGS:
+            self._skip_tag = tag
+            return
+        if self._body_tag is None:
+            if dict(attrs).get("data-testid") == JOB_BODY_TESTID:
+                self._body_tag = tag
+                self._body_depth = 1
+        elif tag == self._body_tag:
+            self._body_depth += 1
+        self.parts.append(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        if self.done or self._skip_tag:
+            return
+        self.parts.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if self._skip_tag:
+            if tag == self._skip_tag:
+                self._skip_tag = None
+            return
+        self.parts.append(f"</{tag}>")
+        if self._body_tag is not None and tag == self._body_tag:
+            self._body_depth -= 1
+            if self._body_depth == 0:
+                self.done = True
+
+    def handle_data(self, data):
+        if not (self.done or self._skip_tag):
+            self.parts.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+    def handle_decl(self, decl):
+        self.handle_data(f"<!{decl}>")
+
+
+async def _stream_job_html(http: httpx.AsyncClient, url: str, max_bytes: int) -> str:
+    html_filter = _StreamingJobHTMLFilter()
+    received = 0
+    async with http.stream("GET", url) as response:
+        response.raise_for_status()
+        encoding = response.charset_encoding or "utf-8"
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            # Unknown charsets (e.g. utf8mb4) fall back to UTF-8 like response.text
+            encoding = "utf-8"
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        async for chunk in response.aiter_bytes():
+            remaining = max_bytes - received
+            if len(chunk) > remaining:
+                html_filter.feed(decoder.decode(chunk[:remaining]))
+                logger.warning(
+                    f"Job page exceeded {max_bytes} bytes; parsing truncated content"
+                )
+                break
+            received += len(chunk)
+            html_filter.feed(decoder.decode(chunk))
+            if html_filter.done:
+                break
+        else:
+            html_filter.feed(decoder.decode(b"", final=True))
+    html_filter.close()
+    return "".join(html_filter.parts)
+
+
+async def fetch_job_html(
+    url: str,
+    *,
+    max_bytes: int = JOB_FETCH_MAX_BYTES,
+    timeout: float = JOB_FETCH_TIMEOUT,
+) -> str:
+    """Stream a job page, dropping <script>/<style> content as bytes arrive.
+    Reading stops at `max_bytes` or once the known job-body container closes;
+    `timeout` bounds the whole download, so slow-drip bodies cannot stall it.
+    """
+    async with httpx.AsyncClient(timeout=timeout) as http:
+        try:
+            return await asyncio.wait_for(_stream_job_html(http, url, max_bytes), timeout)
+        except asyncio.TimeoutError:
+            raise ValueError(f"Timed out fetching job page after {timeout:g}s.")
+
+
 # --- Upload File API ---
 @app.post("/upload/")
 async def upload_txt_file(file: UploadFile = File(...)):
@@ -246,7 +516,8 @@ async def upload_txt_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="File must be UTF-8 encoded.")
 
     file_id = str(uuid.uuid4())
-    memory_store[file_id] = decoded
+    # Parse once so /optimize and /analyze/ can reuse it by file_id
+    memory_store[file_id] = parse_resume(decoded)
     # Avoid logging file contents to protect sensitive data
     logger.info(
         f"Uploaded {file.filename} | ID: {file_id} | size={len(decoded)} chars"
@@ -257,28 +528,232 @@ async def upload_txt_file(file: UploadFile = File(...)):
 # --- Retrieve File Content ---
 @app.get("/file/{file_id}")
 async def get_file_content(file_id: str):
-    content = memory_store.get(file_id)
-    if not content:
+    stored = memory_store.get(file_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found in memory.")
+    return JSONResponse(content={"file_id": file_id, "content": stored.raw})
+
+
+def _stored_resume(file_id: str) -> ParsedResume:
+    stored = memory_store.get(file_id)
+    if not stored:
         raise HTTPException(status_code=404, detail="File not found in memory.")
-    return JSONResponse(content={"file_id": file_id, "content": content})
+    return stored
+
+
+# --- OpenAI connection reuse ---
+@app.get("/metrics/connections")
+async def get_connection_stats():
+    return JSONResponse(content=connection_stats.as_dict())
+
+
+# --- Request deadlines ---
+class DeadlineExceeded(Exception):
+    """Raised when the remaining request budget cannot cover the next step."""
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float):
+        self.expires_at = time.monotonic() + budget_seconds
+
+    @classmethod
+    def from_request(cls, request: Request, deadline_ms: Optional[int]) -> Optional["Deadline"]:
+        """Read the budget from ?deadline_ms= or the X-Deadline-Ms header (milliseconds)."""
+        raw = deadline_ms if deadline_ms is not None else request.headers.get("x-deadline-ms")
+        if raw is None:
+            return None
+        try:
+            budget_ms = int(raw)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Deadline must be an integer number of milliseconds.")
+        if budget_ms <= 0:
+            raise HTTPException(status_code=400, detail="Deadline must be positive.")
+        return cls(budget_ms / 1000)
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+# Rolling per-step latency estimates (seconds), used to decide whether a step still fits the deadline
+STEP_LATENCY_ESTIMATES: Dict[str, float] = {}
+STEP_LATENCY_OBSERVED_AT: Dict[str, float] = {}
+DEFAULT_STEP_LATENCY = float(os.getenv("DEFAULT_STEP_LATENCY", "10"))
+# An estimate halves for every STEP_ESTIMATE_HALF_LIFE seconds without a new observation, so a
+# step skipped after a slow spell gets tried again instead of being skipped for good
+STEP_ESTIMATE_HALF_LIFE = float(os.getenv("STEP_ESTIMATE_HALF_LIFE", "60"))
+# Upper bound for an estimate raised by a timeout
+MAX_STEP_LATENCY = float(os.getenv("MAX_STEP_LATENCY", "120"))
+
+
+# Time reserved after the last call to apply section policies and send the response
+DEADLINE_MARGIN = float(os.getenv("DEADLINE_MARGIN", "0.25"))
+
+
+def _step_estimate(step: str) -> float:
+    estimate = STEP_LATENCY_ESTIMATES.get(step)
+    if estimate is None:
+        return DEFAULT_STEP_LATENCY
+    observed_at = STEP_LATENCY_OBSERVED_AT.get(step)
+    if observed_at is not None and STEP_ESTIMATE_HALF_LIFE > 0:
+        estimate *= 0.5 ** ((time.monotonic() - observed_at) / STEP_ESTIMATE_HALF_LIFE)
+    return estimate
+
+
+def _record_step_latency(step: str, seconds: float) -> None:
+    prev = _step_estimate(step) if step in STEP_LATENCY_ESTIMATES else None
+    STEP_LATENCY_ESTIMATES[step] = seconds if prev is None else 0.7 * prev + 0.3 * seconds
+    STEP_LATENCY_OBSERVED_AT[step] = time.monotonic()
+
+
+def _record_step_timeout(step: str, seconds: float) -> None:
+    # The real latency is unknown but longer than what we waited, so bump the estimate past
+    # the wait. It is based on the wait alone, so repeated timeouts do not compound.
+    STEP_LATENCY_ESTIMATES[step] = min(seconds * 1.5, MAX_STEP_LATENCY)
+    STEP_LATENCY_OBSERVED_AT[step] = time.monotonic()
+
+
+async def _run_until_disconnect(request: Request, coro, poll_interval: float = 0.5):
+    """Await `coro`, cancelling it (and its in-flight upstream calls) if the client disconnects."""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                logger.info("Client disconnected; cancelled resume pipeline")
+                return Response(status_code=499)
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+@app.get("/metrics/assembly")
+async def get_assembly_stats():
+    return JSONResponse(content=ASSEMBLY_COUNTS)
 
 
 # --- Shared pipeline helper ---
+class StepOutputError(Exception):
+    """Raised when a step is cut off by its token cap or returns nothing."""
+
+
+# Steps whose prompts may legitimately return no content (nothing to extract)
+OPTIONAL_OUTPUT_STEPS = {"education", "certifications"}
+
+
+async def _chat_step(
+    step: str,
+    messages: List[Dict[str, str]],
+    *,
+    step_configs: Dict[str, StepConfig],
+    stats: Optional[List[Dict[str, object]]] = None,
+    deadline: Optional[Deadline] = None,
+    **extra,
+):
+    cfg = step_configs[step]
+    openai_client = get_openai_client()
+    attempt = 0
+    while True:
+        call_client = openai_client
+        if deadline is not None:
+            budget = deadline.remaining() - DEADLINE_MARGIN
+            if budget < _step_estimate(step):
+                raise DeadlineExceeded(f"{max(budget, 0):.1f}s left, not enough for step {step}")
+            # The SDK's own retries cannot see the deadline, so retry here instead
+            call_client = openai_client.with_options(timeout=budget, max_retries=0)
+        started = time.perf_counter()
+        try:
+            response = await call_client.chat.completions.create(
+                messages=messages, **cfg.request_kwargs(), **extra
+            )
+            break
+        except APITimeoutError as e:
+            if deadline is None:
+                raise
+            _record_step_timeout(step, time.perf_counter() - started)
+            raise DeadlineExceeded(f"Deadline reached during step {step}") from e
+        except (RateLimitError, InternalServerError, APIConnectionError) as e:
+            if deadline is None or attempt >= openai_client.max_retries:
+                raise
+            attempt += 1
+            backoff = min(8.0, 0.5 * 2 ** (attempt - 1))
+            budget = deadline.remaining() - DEADLINE_MARGIN - backoff
+            if budget < _step_estimate(step):
+                raise DeadlineExceeded(
+                    f"Step {step} failed ({e.__class__.__name__}) with no budget left to retry"
+                ) from e
+            logger.warning(f"Step {step} failed ({e.__class__.__name__}); retry {attempt} in {backoff:g}s")
+            await asyncio.sleep(backoff)
+    elapsed = time.perf_counter() - started
+    _record_step_latency(step, elapsed)
+    usage = getattr(response, "usage", None)
+    record = {
+        "step": step,
+        "model": cfg.model,
+        "seconds": round(elapsed, 3),
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+    if stats is not None:
+        stats.append(record)
+    logger.info(
+        f"Step {step} | model={cfg.model} | {record['seconds']}s | "
+        f"tokens in={record['prompt_tokens']} out={record['completion_tokens']}"
+    )
+
+    # max_completion_tokens also counts reasoning tokens, so a capped step can end up empty
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        problem = "hit the token limit"
+    elif not (choice.message.content or "").strip() and step not in OPTIONAL_OUTPUT_STEPS:
+        problem = "returned empty content"
+    else:
+        return response
+    if cfg.max_completion_tokens:
+        logger.warning(
+            f"Step {step} {problem} (max_completion_tokens={cfg.max_completion_tokens}); "
+            "retrying without the cap"
+        )
+        return await _chat_step(
+            step,
+            messages,
+            step_configs={**step_configs, step: replace(cfg, max_completion_tokens=None)},
+            stats=stats,
+            deadline=deadline,
+            **extra,
+        )
+    logger.error(f"Step {step} {problem} (finish_reason={choice.finish_reason})")
+    raise StepOutputError(f"Step {step} {problem}")
+
+
 async def _run_resume_pipeline(
     resume_text: str,
     job_text: str,
     *,
     latex: bool = False,
     latex_template: str = "",
+    step_configs: Optional[Dict[str, StepConfig]] = None,
+    stats: Optional[List[Dict[str, object]]] = None,
+    assembler: Optional[str] = None,
+    parsed: Optional[ParsedResume] = None,
+    deadline: Optional[Deadline] = None,
 ):
     prompts = ResumePrompts()
+    step_configs = step_configs or STEP_CONFIGS
 
-    # Compute original section presence (for downstream prompts and enforcement)
-    orig_presence = _original_section_presence(resume_text)
+    # Reuse the upload-time parse when available (for downstream prompts and enforcement)
+    parsed = parsed or parse_resume(resume_text)
+    resume_text = parsed.text
+    orig_presence = parsed.presence
 
     # --- Step 2: Analyze the Job Description ---
-    step1 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step1 = await _chat_step(
+        "job_analysis",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {"role": "system", "content": prompts.job_description_analysis_prompt},
             {"role": "user", "content": f"Job:\n{job_text}"},
@@ -289,8 +764,11 @@ async def _run_resume_pipeline(
     logger.info("Step 1: Job Description Analysis Complete")
 
     # --- Step 3: Resume Matching ---
-    step2 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step2 = await _chat_step(
+        "resume_matching",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {"role": "system", "content": prompts.resume_matching_prompt},
             {
@@ -304,8 +782,11 @@ async def _run_resume_pipeline(
     logger.info("Step 2: Resume Matching Complete")
 
     # --- Step 4: Rewrite Summary & Skills ---
-    step3 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step3 = await _chat_step(
+        "summary_skills",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {"role": "system", "content": prompts.resume_summary_skills_prompt},
             {
@@ -319,8 +800,11 @@ async def _run_resume_pipeline(
     logger.info("Step 3: Summary & Skills Rewrite Complete")
 
     # --- Step 5: Refine Experience Section ---
-    step4 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step4 = await _chat_step(
+        "experience",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {
                 "role": "system",
@@ -337,8 +821,11 @@ async def _run_resume_pipeline(
     logger.info("Step 4: Experience Rewrite Complete")
 
     # --- Step 5: Education Formatting ---
-    step5 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step5 = await _chat_step(
+        "education",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {"role": "system", "content": prompts.resume_education_prompt},
             {
@@ -351,8 +838,11 @@ async def _run_resume_pipeline(
     logger.info("Step 5: Education Section Formatting Complete")
 
     # --- Step 6: Certifications Formatting ---
-    step6 = await client.chat.completions.create(
-        model="gpt-5-nano",
+    step6 = await _chat_step(
+        "certifications",
+        step_configs=step_configs,
+        stats=stats,
+        deadline=deadline,
         messages=[
             {"role": "system", "content": prompts.resume_certifications_prompt},
             {"role": "user", "content": f"Current Resume:\n{resume_text}"},
@@ -361,27 +851,6 @@ async def _run_resume_pipeline(
     certifications_entries = (step6.choices[0].message.content or "").strip()
     logger.info("Step 6: Certifications Section Formatting Complete")
 
-    # --- Step 7: Assemble Final Resume ---
-    step7 = await client.chat.completions.create(
-        model="gpt-5-nano",
-        messages=[
-            {"role": "system", "content": prompts.final_resume_assembly_prompt},
-            {
-                "role": "user",
-                "content": (
-                    "Summary and Skills section:\n" + summary_skills +
-                    "\n\nExperience section:\n" + experience_section +
-                    ("\n\nEducation entries (one per line):\n" + education_entries if education_entries else "\n\nEducation entries: NONE") +
-                    ("\n\nCertification entries (one per line):\n" + certifications_entries if certifications_entries else "\n\nCertification entries: NONE") +
-                    "\n\nOriginal section presence (for strict policy):\n"
-                    f"- EDUCATION: {'YES' if orig_presence.get('EDUCATION') else 'NO'}\n"
-                    f"- CERTIFICATIONS: {'YES' if orig_presence.get('CERTIFICATIONS') else 'NO'}\n"
-                    f"- PROJECTS: {'YES' if orig_presence.get('PROJECTS') else 'NO'}\n"
-                ),
-            },
-        ],
-        #temperature=0.2,
-    )
     def sanitize_resume_output(text: str) -> str:
         if not text:
             return text
@@ -395,63 +864,157 @@ async def _run_resume_pipeline(
             cleaned = pattern.sub("", cleaned)
         return cleaned.strip()
 
-    final_resume = sanitize_resume_output(step7.choices[0].message.content)
+    # --- Step 7: Assemble Final Resume ---
+    assembler = (assembler or RESUME_ASSEMBLER).lower()
+    final_resume = None
+    if assembler == "local":
+        started = time.perf_counter()
+        final_resume = assemble_resume_locally(
+            parsed,
+            summary_skills,
+            experience_section,
+            education_entries,
+            certifications_entries,
+        )
+        if final_resume is None:
+            ASSEMBLY_COUNTS["llm_fallback"] += 1
+            logger.warning(
+                "Step 7: Local assembly incomplete; falling back to LLM assembler "
+                f"({ASSEMBLY_COUNTS['llm_fallback']} fallback(s) of "
+                f"{ASSEMBLY_COUNTS['local'] + ASSEMBLY_COUNTS['llm_fallback']} local attempts)"
+            )
+        else:
+            ASSEMBLY_COUNTS["local"] += 1
+            if stats is not None:
+                stats.append({
+                    "step": "assembly",
+                    "model": "local",
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                })
+    else:
+        ASSEMBLY_COUNTS["llm"] += 1
+
+    if final_resume is None:
+        step7 = await _chat_step(
+            "assembly",
+            step_configs=step_configs,
+            stats=stats,
+            deadline=deadline,
+            messages=[
+                {"role": "system", "content": prompts.final_resume_assembly_prompt},
+                {
+                    "role": "user",
+                    "content": (
+                        "Original Resume:\n" + resume_text +
+                        "\n\nSummary and Skills section:\n" + summary_skills +
+                        "\n\nExperience section:\n" + experience_section +
+                        ("\n\nEducation entries (one per line):\n" + education_entries if education_entries else "\n\nEducation entries: NONE") +
+                        ("\n\nCertification entries (one per line):\n" + certifications_entries if certifications_entries else "\n\nCertification entries: NONE") +
+                        "\n\nOriginal section presence (for strict policy):\n"
+                        f"- EDUCATION: {'YES' if orig_presence.get('EDUCATION') else 'NO'}\n"
+                        f"- CERTIFICATIONS: {'YES' if orig_presence.get('CERTIFICATIONS') else 'NO'}\n"
+                        f"- PROJECTS: {'YES' if orig_presence.get('PROJECTS') else 'NO'}\n"
+                    ),
+                },
+            ],
+            #temperature=0.2,
+        )
+        final_resume = step7.choices[0].message.content
+
+    final_resume = sanitize_resume_output(final_resume)
     logger.info("Step 7: Resume Assembly Complete")
 
     # --- Step 8: Optimize for All Screeners ---
-    step8 = await client.chat.completions.create(
-        model="gpt-5-nano",
-        messages=[
-            {"role": "system", "content": prompts.final_resume_optimization_prompt},
-            {
-                "role": "user",
-                "content": (
-                    f"Full Resume (use EXACT headers):\n{final_resume}\n\n"
-                    f"Original section presence (for strict policy):\n"
-                    f"- EDUCATION: {'YES' if orig_presence.get('EDUCATION') else 'NO'}\n"
-                    f"- CERTIFICATIONS: {'YES' if orig_presence.get('CERTIFICATIONS') else 'NO'}\n"
-                    f"- PROJECTS: {'YES' if orig_presence.get('PROJECTS') else 'NO'}\n\n"
-                    f"Job Description Analysis:\n{job_analysis}"
-                ),
-            },
-        ],
-        #temperature=0.2,
-    )
-    optimized_resume = sanitize_resume_output(step8.choices[0].message.content)
-    # Enforce deterministic section policies irrespective of model behavior
-    optimized_resume = enforce_section_policies(optimized_resume, resume_text)
-    logger.info("Step 8: Final Optimization Complete")
+    # Degrade to the step 7 assembly (policy-enforced) when the deadline cannot cover this call
+    degraded = None
+    try:
+        step8 = await _chat_step(
+            "optimization",
+            step_configs=step_configs,
+            stats=stats,
+            deadline=deadline,
+            messages=[
+                {"role": "system", "content": prompts.final_resume_optimization_prompt},
+                {
+                    "role": "user",
+                    "content": (
+                        f"Full Resume (use EXACT headers):\n{final_resume}\n\n"
+                        f"Original section presence (for strict policy):\n"
+                        f"- EDUCATION: {'YES' if orig_presence.get('EDUCATION') else 'NO'}\n"
+                        f"- CERTIFICATIONS: {'YES' if orig_presence.get('CERTIFICATIONS') else 'NO'}\n"
+                        f"- PROJECTS: {'YES' if orig_presence.get('PROJECTS') else 'NO'}\n\n"
+                        f"Job Description Analysis:\n{job_analysis}"
+                    ),
+                },
+            ],
+            #temperature=0.2,
+        )
+        optimized_resume = sanitize_resume_output(step8.choices[0].message.content)
+        # Enforce deterministic section policies irrespective of model behavior
+        optimized_resume = enforce_section_policies(optimized_resume, resume_text, orig_presence)
+        logger.info("Step 8: Final Optimization Complete")
+    except DeadlineExceeded as e:
+        logger.warning(f"Step 8 skipped ({e}); returning step 7 assembly")
+        optimized_resume = enforce_section_policies(final_resume, resume_text, orig_presence)
+        degraded = "optimization"
 
     # --- Optional: LaTeX Formatting ---
     if latex:
         format_prompt = f"Format the resume in LaTeX using this style:\n{latex_template}"
-        latex_result = await client.chat.completions.create(
-            model="gpt-5-nano",
-            messages=[
-                {"role": "system", "content": format_prompt},
-                {"role": "user", "content": f"Current Version:\n{optimized_resume}"},
-            ],
-            temperature=0.3,
-        )
-        return {"latex": True, "content": latex_result.choices[0].message.content}
+        try:
+            latex_result = await _chat_step(
+                "latex",
+                step_configs=step_configs,
+                stats=stats,
+                deadline=deadline,
+                messages=[
+                    {"role": "system", "content": format_prompt},
+                    {"role": "user", "content": f"Current Version:\n{optimized_resume}"},
+                ],
+                temperature=0.3,
+            )
+            return {
+                "latex": True,
+                "content": latex_result.choices[0].message.content,
+                "degraded": degraded,
+            }
+        except DeadlineExceeded as e:
+            logger.warning(f"LaTeX formatting skipped ({e}); returning plain text")
+            degraded = degraded or "latex"
 
-    return {"latex": False, "content": optimized_resume}
+    return {"latex": False, "content": optimized_resume, "degraded": degraded}
+
+
+def _degraded_headers(result: Dict[str, object]) -> Dict[str, str]:
+    # Tell clients which step was skipped to meet the deadline
+    return {"X-Resume-Degraded": str(result["degraded"])} if result.get("degraded") else {}
 
 
 # --- Resume Analyzer ---
 @app.post("/analyze/")
 async def analyze_resume_and_job(
-    resume: UploadFile = File(...),
+    resume: Optional[UploadFile] = File(None),
+    file_id: Optional[str] = Form(None),
     job: Optional[UploadFile] = File(None),
     latex_format: Optional[UploadFile] = File(None),
     job_url: Optional[str] = Form(None),
     latex: bool = Query(default=False, description="Return LaTeX formatted output"),
     plain: bool = Query(default=False, description="If true, return text/plain"),
+    deadline_ms: Optional[int] = Query(default=None, description="Time budget in ms (or X-Deadline-Ms header)"),
     request: Request = None,
 ):
     try:
-        # --- Step 0: Read Resume ---
-        resume_text = (await resume.read()).decode("utf-8")
+        deadline = Deadline.from_request(request, deadline_ms) if request else None
+
+        # --- Step 0: Read Resume (uploaded file or previously stored file_id) ---
+        if file_id:
+            parsed = _stored_resume(file_id)
+        elif resume:
+            parsed = parse_resume((await resume.read()).decode("utf-8"))
+        else:
+            raise HTTPException(status_code=400, detail="Provide a resume file or file_id.")
 
         # --- Step 1: Load Job Description ---
         job_text = None
@@ -463,10 +1026,12 @@ async def analyze_resume_and_job(
                 raise HTTPException(status_code=400, detail="Job file is empty.")
             job_text = job_bytes.decode("utf-8")
         elif job_url:
-            async with httpx.AsyncClient() as http:
-                response = await http.get(job_url, timeout=20)
-                response.raise_for_status()
-                job_text = extract_job_text_flexibly(response.text)
+            fetch_timeout = JOB_FETCH_TIMEOUT
+            if deadline is not None:
+                fetch_timeout = max(0.1, min(fetch_timeout, deadline.remaining()))
+            job_text = extract_job_text_flexibly(
+                await fetch_job_html(job_url, timeout=fetch_timeout)
+            )
         else:
             raise HTTPException(
                 status_code=400, detail="Provide a job file or job_url."
@@ -484,28 +1049,40 @@ async def analyze_resume_and_job(
                     status_code=400, detail="Could not read LaTeX template."
                 )
 
-        result = await _run_resume_pipeline(
-            resume_text=resume_text,
+        pipeline = _run_resume_pipeline(
+            resume_text=parsed.text,
             job_text=job_text,
             latex=latex,
             latex_template=latex_template,
+            parsed=parsed,
+            deadline=deadline,
         )
+        result = await (_run_until_disconnect(request, pipeline) if request else pipeline)
+        if isinstance(result, Response):
+            return result
+        headers = _degraded_headers(result)
 
         if result.get("latex"):
             return PlainTextResponse(
                 content=result["content"],
                 media_type="application/x-latex",
                 headers={
-                    "Content-Disposition": 'attachment; filename="optimized_resume.tex"'
+                    "Content-Disposition": 'attachment; filename="optimized_resume.tex"',
+                    **headers,
                 },
             )
 
         accept = (request.headers.get("accept") or "").lower() if request else ""
         if plain or "text/plain" in accept:
-            return PlainTextResponse(content=result["content"], media_type="text/plain")
+            return PlainTextResponse(content=result["content"], media_type="text/plain", headers=headers)
 
-        return JSONResponse(content={"optimized_resume": result["content"]})
+        return JSONResponse(content={"optimized_resume": result["content"]}, headers=headers)
 
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        logger.warning(f"Resume analysis exceeded its deadline: {e}")
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded: {str(e)}")
     except Exception as e:
         logger.exception("Resume optimization workflow failed.")
         raise HTTPException(
@@ -515,20 +1092,48 @@ async def analyze_resume_and_job(
 
 # --- JSON Optimize Endpoint ---
 class OptimizeRequest(BaseModel):
-    resume: str
+    resume: Optional[str] = None
+    file_id: Optional[str] = None  # reference to a resume stored via /upload/
     jobDescription: str
 
 
 @app.post("/optimize")
-async def optimize_json(payload: OptimizeRequest, request: Request, plain: bool = Query(default=False)):
+async def optimize_json(
+    payload: OptimizeRequest,
+    request: Request,
+    plain: bool = Query(default=False),
+    deadline_ms: Optional[int] = Query(default=None, description="Time budget in ms (or X-Deadline-Ms header)"),
+):
     try:
-        result = await _run_resume_pipeline(
-            resume_text=payload.resume, job_text=payload.jobDescription, latex=False
+        deadline = Deadline.from_request(request, deadline_ms)
+        if payload.file_id:
+            parsed = _stored_resume(payload.file_id)
+        elif payload.resume is not None:
+            parsed = parse_resume(payload.resume)
+        else:
+            raise HTTPException(status_code=400, detail="Provide resume text or file_id.")
+        result = await _run_until_disconnect(
+            request,
+            _run_resume_pipeline(
+                resume_text=parsed.text,
+                job_text=payload.jobDescription,
+                latex=False,
+                parsed=parsed,
+                deadline=deadline,
+            ),
         )
+        if isinstance(result, Response):
+            return result
+        headers = _degraded_headers(result)
         accept = (request.headers.get("accept") or "").lower()
         if plain or "text/plain" in accept:
-            return PlainTextResponse(content=result["content"], media_type="text/plain")
-        return JSONResponse(content={"optimized_resume": result["content"]})
+            return PlainTextResponse(content=result["content"], media_type="text/plain", headers=headers)
+        return JSONResponse(content={"optimized_resume": result["content"]}, headers=headers)
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        logger.warning(f"JSON optimize exceeded its deadline: {e}")
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded: {str(e)}")
     except Exception as e:
         logger.exception("JSON optimize workflow failed.")
         raise HTTPException(
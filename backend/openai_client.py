@@ -0,0 +1,142 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 90.0
+    http2: bool = True
+    warm_connections: int = 2
+    # Re-warm once the pool has been idle this long; 0 disables the idle watcher
+    rewarm_after: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "90")),
+            http2=os.getenv("OPENAI_HTTP2", "true").strip().lower() in ("1", "true", "yes"),
+            warm_connections=int(os.getenv("OPENAI_WARM_CONNECTIONS", "2")),
+            rewarm_after=float(os.getenv("OPENAI_REWARM_AFTER", "60")),
+        )
+
+
+@dataclass
+class ConnectionStats:
+    requests: int = 0
+    new_connections: int = 0
+    warmup_requests: int = 0
+    warmup_connections: int = 0
+    last_activity: float = field(default_factory=time.monotonic)
+
+    @property
+    def reuse_rate(self) -> float:
+        if not self.requests:
+            return 0.0
+        return max(0.0, 1 - self.new_connections / self.requests)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_rate": round(self.reuse_rate, 3),
+            "warmup_requests": self.warmup_requests,
+            "warmup_connections": self.warmup_connections,
+        }
+
+
+_warming: contextvars.ContextVar[bool] = contextvars.ContextVar("openai_warming", default=False)
+
+
+def build_openai_client(
+    api_key: str, stats: ConnectionStats, settings: PoolSettings
+) -> AsyncOpenAI:
+    """AsyncOpenAI backed by an explicitly pooled httpx client that counts connections."""
+
+    async def on_request(request: httpx.Request) -> None:
+        warming = _warming.get()
+        stats.last_activity = time.monotonic()
+        if warming:
+            stats.warmup_requests += 1
+        else:
+            stats.requests += 1
+
+        # httpcore only emits connect_tcp events when it opens a new connection
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                if warming:
+                    stats.warmup_connections += 1
+                else:
+                    stats.new_connections += 1
+
+        request.extensions["trace"] = trace
+
+    if settings.http2 and not HTTP2_AVAILABLE:
+        logger.warning("OPENAI_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        http2=settings.http2 and HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(600.0, connect=10.0),
+        event_hooks={"request": [on_request]},
+    )
+    logger.info(
+        f"OpenAI client pool | max={settings.max_connections} "
+        f"keepalive={settings.max_keepalive_connections}/{settings.keepalive_expiry:g}s "
+        f"http2={settings.http2 and HTTP2_AVAILABLE}"
+    )
+    return AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+
+async def warm_up(client: AsyncOpenAI, connections: int) -> None:
+    """Open `connections` pooled connections (DNS + TLS) with cheap concurrent requests."""
+    token = _warming.set(True)
+    try:
+        warm_client = client.with_options(max_retries=0, timeout=10.0)
+        results = await asyncio.gather(
+            *(warm_client.models.list() for _ in range(max(connections, 0))),
+            return_exceptions=True,
+        )
+    finally:
+        _warming.reset(token)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.warning(f"OpenAI warm-up: {len(failures)}/{len(results)} requests failed: {failures[0]}")
+    else:
+        logger.info(f"OpenAI warm-up: {len(results)} connection(s) ready")
+
+
+async def keep_warm(
+    client: AsyncOpenAI, stats: ConnectionStats, settings: PoolSettings
+) -> None:
+    """Re-warm the pool whenever it has been idle for `rewarm_after` seconds."""
+    while True:
+        idle = time.monotonic() - stats.last_activity
+        if idle < settings.rewarm_after:
+            await asyncio.sleep(settings.rewarm_after - idle)
+            continue
+        await warm_up(client, settings.warm_connections)
+        logger.info(f"OpenAI connection stats | {stats.as_dict()}")
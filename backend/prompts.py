@@ -47,7 +47,7 @@ class ResumePrompts:
     "1. Current Resume: The original resume including the user’s existing summary and skills sections.\n"
     "2. Job Description Analysis: A structured breakdown of a target job (from Step 1).\n"
     "3. Resume Matching Insights: A list of missing keywords, suggested phrasing improvements, and alignment recommendations (from Step 2).\n\n"
-    "Your task is to rewrite and optimize ONLY the **Summary** and **Skills** sections of the resume to:\n"
+    "Your task is to rewrite and optimize ONLY the SUMMARY and SKILLS sections of the resume to:\n"
     "- Clearly reflect the user’s qualifications aligned with the target job.\n"
     "- Incorporate relevant hard and soft skills from the job description.\n"
     "- Use terminology and phrasing that mirrors the job description while staying truthful to the original experience.\n"
@@ -60,7 +60,10 @@ class ResumePrompts:
     "Do NOT:\n"
     "- Fabricate experience, roles, or achievements not found in the resume.\n"
     "- Modify job titles or employment dates.\n\n"
-    "Output only the revised **Summary** and **Skills** sections in a clean, formatted way."
+    "Output format (plain text, no Markdown):\n"
+    "- The first line must be exactly SUMMARY, followed by the revised summary.\n"
+    "- Then a blank line, a line that is exactly SKILLS, and the skills as simple hyphen bullets '- '.\n"
+    "- Output ONLY these two sections: no introduction, commentary, asterisks, or '#' headings."
     )
 
     resume_experience_refinement_prompt: str = (
@@ -78,7 +81,10 @@ class ResumePrompts:
     "Important constraints:\n"
     "- You must preserve factual accuracy — do not add jobs, fabricate accomplishments, or modify timelines.\n"
     "- You may only infer skills or competencies if they are logically supported by the original experience.\n\n"
-    "Output a fully rewritten **Experience** section that retains all original jobs and job titles, while enhancing language, structure, and alignment with the target role."
+    "Output a fully rewritten EXPERIENCE section that retains all original jobs and job titles, while enhancing language, structure, and alignment with the target role.\n\n"
+    "Output format (plain text, no Markdown):\n"
+    "- The first line must be exactly EXPERIENCE, followed by the roles and their '- ' bullets.\n"
+    "- Output ONLY this section: no introduction, commentary, asterisks, or '#' headings."
     )
 
     resume_education_prompt: str = (
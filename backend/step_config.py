@@ -0,0 +1,92 @@
+import json
+import os
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class StepConfig:
+    model: str = "gpt-5-nano"
+    max_completion_tokens: Optional[int] = None
+    reasoning_effort: Optional[str] = None
+
+    def request_kwargs(self) -> Dict[str, object]:
+        kwargs: Dict[str, object] = {"model": self.model}
+        if self.max_completion_tokens:
+            kwargs["max_completion_tokens"] = self.max_completion_tokens
+        if self.reasoning_effort:
+            kwargs["reasoning_effort"] = self.reasoning_effort
+        return kwargs
+
+
+# Pipeline steps in execution order. Simple formatting steps get a small
+# budget and minimal reasoning; rewrite steps keep the model's default effort.
+DEFAULT_STEP_CONFIGS: Dict[str, StepConfig] = {
+    "job_analysis": StepConfig(max_completion_tokens=6000),
+    "resume_matching": StepConfig(max_completion_tokens=6000),
+    "summary_skills": StepConfig(max_completion_tokens=6000),
+    "experience": StepConfig(max_completion_tokens=8000),
+    "education": StepConfig(max_completion_tokens=2000, reasoning_effort="minimal"),
+    "certifications": StepConfig(max_completion_tokens=2000, reasoning_effort="minimal"),
+    "assembly": StepConfig(max_completion_tokens=8000, reasoning_effort="low"),
+    "optimization": StepConfig(max_completion_tokens=8000),
+    "latex": StepConfig(max_completion_tokens=10000),
+}
+
+_FIELDS = ("model", "max_completion_tokens", "reasoning_effort")
+
+
+def _apply_overrides(base: StepConfig, overrides: Dict[str, object]) -> StepConfig:
+    unknown = set(overrides) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown step config keys: {', '.join(sorted(unknown))}")
+    values = dict(overrides)
+    if values.get("max_completion_tokens") is not None:
+        values["max_completion_tokens"] = int(values["max_completion_tokens"])
+    return replace(base, **values)
+
+
+def load_step_configs(
+    path: Optional[str] = None, profile: Optional[str] = None
+) -> Dict[str, StepConfig]:
+    """Build per-step configs from defaults, an optional JSON file and env vars.
+
+    The JSON file (STEP_CONFIG_FILE) maps step names to overrides, either at the
+    top level or under "profiles": {"<name>": {...}} selected by STEP_PROFILE.
+    Env vars STEP_<STEP>_MODEL, STEP_<STEP>_MAX_COMPLETION_TOKENS and
+    STEP_<STEP>_REASONING_EFFORT take precedence over the file.
+    """
+    configs = dict(DEFAULT_STEP_CONFIGS)
+
+    path = path if path is not None else os.getenv("STEP_CONFIG_FILE", "").strip()
+    profile = profile if profile is not None else os.getenv("STEP_PROFILE", "").strip()
+    if path:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if profile:
+            profiles = data.get("profiles", {})
+            if profile not in profiles:
+                raise ValueError(f"Unknown step profile: {profile}")
+            data = profiles[profile]
+        for step, overrides in data.items():
+            if step == "profiles":
+                continue
+            if step not in configs:
+                raise ValueError(f"Unknown pipeline step: {step}")
+            configs[step] = _apply_overrides(configs[step], overrides)
+
+    for step in configs:
+        env_overrides: Dict[str, object] = {}
+        for field in _FIELDS:
+            value = os.getenv(f"STEP_{step.upper()}_{field.upper()}", "").strip()
+            if value:
+                env_overrides[field] = value
+        if env_overrides:
+            configs[step] = _apply_overrides(configs[step], env_overrides)
+
+    return configs
+
+
+def list_profiles(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return list(json.load(fh).get("profiles", {}))
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+from openai import AsyncOpenAI
+
+# main.py builds its OpenAI client from the environment; tests never hit the real API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+
+@pytest.fixture
+def read_fixture():
+    """Return the text of a file in backend/fixtures/."""
+
+    def read(name: str) -> str:
+        with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as fh:
+            return fh.read()
+
+    return read
+
+
+@pytest.fixture(scope="session")
+def stub():
+    from stub_server import BackgroundStub, create_app
+
+    with BackgroundStub(create_app(delays={}, base_latency=0.0, seconds_per_token=0.0)) as server:
+        yield server
+
+
+@pytest.fixture
+def stub_client(stub, monkeypatch):
+    """Point main's OpenAI client at the stub and reset per-test pipeline state."""
+    import main
+
+    stub.app.state.calls.clear()
+    stub.app.state.delays.clear()
+    stub.app.state.failures.clear()
+    monkeypatch.setattr(main, "client", AsyncOpenAI(api_key="test-key", base_url=stub.base_url))
+    monkeypatch.setattr(main, "STEP_LATENCY_ESTIMATES", {})
+    monkeypatch.setattr(main, "STEP_LATENCY_OBSERVED_AT", {})
+    return stub
+
+
+@pytest.fixture
+def api(stub_client, monkeypatch):
+    """TestClient for main.app whose lifespan-built OpenAI client talks to the stub."""
+    import main
+    from fastapi.testclient import TestClient
+    from openai_client import ConnectionStats, PoolSettings
+
+    monkeypatch.setenv("OPENAI_BASE_URL", stub_client.base_url)
+    monkeypatch.setattr(main, "POOL_SETTINGS", PoolSettings(warm_connections=0, rewarm_after=0))
+    monkeypatch.setattr(main, "connection_stats", ConnectionStats())
+    monkeypatch.setattr(main, "memory_store", {})
+    with TestClient(main.app) as client:
+        yield client
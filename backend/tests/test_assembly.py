@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def parsed_fixture(read_fixture):
+    return lambda name: main.parse_resume(read_fixture(name))
+
+
+SUMMARY_SKILLS = (
+    "SUMMARY\nBackend engineer focused on high-throughput Python APIs.\n\n"
+    "SKILLS\n- Python, FastAPI\n- PostgreSQL, Redis"
+)
+EXPERIENCE = (
+    "EXPERIENCE\nSenior Software Engineer, Brightline Analytics (2021 - Present)\n"
+    "- Built an event ingestion service handling 40k requests per minute"
+)
+
+
+def test_full_fixture_keeps_original_preamble_projects_and_entries(parsed_fixture):
+    original = parsed_fixture("resume_full.txt")
+
+    text = main.assemble_resume_locally(
+        original,
+        SUMMARY_SKILLS,
+        EXPERIENCE,
+        "- B.S. Computer Science, University of Texas at Austin, 2018",
+        "- AWS Certified Developer - Associate, Amazon Web Services, 2022",
+    )
+
+    assert text == (
+        "Alex Morgan\n"
+        "alex.morgan@example.com | (555) 010-2030 | Austin, TX\n\n"
+        "SUMMARY\nBackend engineer focused on high-throughput Python APIs.\n\n"
+        "SKILLS\n- Python, FastAPI\n- PostgreSQL, Redis\n\n"
+        "EXPERIENCE\nSenior Software Engineer, Brightline Analytics (2021 - Present)\n"
+        "- Built an event ingestion service handling 40k requests per minute\n\n"
+        "PROJECTS\n- pgwatch-lite: open-source Postgres metrics exporter (1.2k GitHub stars)\n\n"
+        "EDUCATION\n- B.S. Computer Science, University of Texas at Austin, 2018\n\n"
+        "CERTIFICATIONS\n- AWS Certified Developer - Associate, Amazon Web Services, 2022\n"
+    )
+    assert main.enforce_section_policies(text, original.text, original.presence) == text
+
+
+def test_minimal_fixture_omits_conditional_sections_and_blanks_education(parsed_fixture):
+    original = parsed_fixture("resume_minimal.txt")
+
+    text = main.assemble_resume_locally(
+        original, SUMMARY_SKILLS, EXPERIENCE, "- Invented degree", "- Invented cert"
+    )
+
+    presence = main._original_section_presence(text)
+    assert not presence["PROJECTS"] and not presence["CERTIFICATIONS"]
+    assert text.endswith("EDUCATION\n")
+    assert "Invented" not in text
+
+
+@pytest.mark.parametrize(
+    "summary_skills",
+    [
+        "**Summary**\nBackend engineer.\n\n**Skills**\n* Python",
+        "## Summary\nBackend engineer.\n\n## Skills:\n- **Python**",
+        "Here is the rewritten section:\n\nSummary:\nBackend engineer.\n\nSkills\n- Python\n\nLet me know if you need changes.",
+    ],
+)
+def test_markdown_and_chatter_are_normalized(summary_skills, parsed_fixture):
+    text = main.assemble_resume_locally(
+        parsed_fixture("resume_minimal.txt"), summary_skills, EXPERIENCE, "", ""
+    )
+
+    assert "SUMMARY\nBackend engineer.\n\nSKILLS\n- Python\n\n" in text
+    assert "*" not in text and "#" not in text and "Let me know" not in text
+
+
+def test_headerless_experience_drops_chatter_and_markdown(parsed_fixture):
+    experience = (
+        "Here is the rewritten Experience section:\n\n"
+        "**Customer Support Specialist, Helpdesk Co (2019 - Present)**\n"
+        "* Resolved 60+ tickets per day with 97% satisfaction\n"
+        "---\n"
+    )
+
+    text = main.assemble_resume_locally(
+        parsed_fixture("resume_minimal.txt"), SUMMARY_SKILLS, experience, "", ""
+    )
+
+    assert (
+        "EXPERIENCE\nCustomer Support Specialist, Helpdesk Co (2019 - Present)\n"
+        "- Resolved 60+ tickets per day with 97% satisfaction\n\n"
+    ) in text
+    assert "Here is" not in text
+
+
+def test_content_resembling_chatter_or_markdown_is_kept(parsed_fixture):
+    summary_skills = (
+        "SUMMARY\nSure-footed release manager.\nNote: open to relocation.\n\n"
+        "SKILLS\n- Python (__init__ hooks, `pytest` fixtures)\n- **Go** and __Rust__ tooling\n"
+        "Sure, I can adjust anything above."
+    )
+
+    text = main.assemble_resume_locally(
+        parsed_fixture("resume_minimal.txt"), summary_skills, EXPERIENCE, "", ""
+    )
+
+    assert "SUMMARY\nSure-footed release manager.\nNote: open to relocation.\n" in text
+    assert "- Python (__init__ hooks, `pytest` fixtures)\n- Go and __Rust__ tooling\n" in text
+    assert "Sure, I can" not in text
+
+
+def test_unparseable_summary_returns_none(parsed_fixture):
+    assert main.assemble_resume_locally(
+        parsed_fixture("resume_full.txt"), "Backend engineer, Python", EXPERIENCE, "", ""
+    ) is None
+
+
+def test_pipeline_counts_local_assembly_and_fallback(stub_client, monkeypatch, parsed_fixture):
+    monkeypatch.setattr(main, "ASSEMBLY_COUNTS", {"local": 0, "llm": 0, "llm_fallback": 0})
+    resume = parsed_fixture("resume_full.txt").text
+
+    asyncio.run(main._run_resume_pipeline(resume, "Python job", assembler="local"))
+    monkeypatch.setattr(main, "assemble_resume_locally", lambda *args: None)
+    asyncio.run(main._run_resume_pipeline(resume, "Python job", assembler="local"))
+
+    assert main.ASSEMBLY_COUNTS == {"local": 1, "llm": 0, "llm_fallback": 1}
+    steps = [call["step"] for call in stub_client.app.state.calls]
+    assert steps.count("assembly") == 1
+
+
+@pytest.mark.parametrize("name", ["resume_full.txt", "resume_minimal.txt"])
+def test_stub_llm_assembly_matches_local(stub_client, parsed_fixture, name):
+    resume = parsed_fixture(name).text
+
+    results = {
+        assembler: asyncio.run(main._run_resume_pipeline(resume, "Python job", assembler=assembler))
+        for assembler in ("local", "llm")
+    }
+
+    assert results["llm"]["content"] == results["local"]["content"]
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import socket
+import time
+from urllib.parse import urlparse
+
+import pytest
+
+import main
+from openai_client import PoolSettings
+
+
+@pytest.fixture
+def resume(read_fixture):
+    return read_fixture("resume_full.txt")
+
+
+@pytest.fixture(autouse=True)
+def fast_defaults(monkeypatch):
+    monkeypatch.setattr(main, "DEFAULT_STEP_LATENCY", 0.01)
+
+
+def _steps(stub):
+    return [call["step"] for call in stub.app.state.calls]
+
+
+def _timed(coro):
+    started = time.monotonic()
+    result = asyncio.run(coro)
+    return result, time.monotonic() - started
+
+
+def test_slow_final_step_degrades_before_deadline(stub_client, resume):
+    stub_client.app.state.delays["optimization"] = 3.0
+
+    result, elapsed = _timed(
+        main._run_resume_pipeline(resume, "Python job", deadline=main.Deadline(2.0))
+    )
+
+    assert result["degraded"] == "optimization"
+    assert "SUMMARY" in result["content"] and "EDUCATION" in result["content"]
+    # The call is capped at remaining - margin, leaving time to respond
+    assert elapsed < 2.0 - main.DEADLINE_MARGIN / 2
+    assert main.STEP_LATENCY_ESTIMATES["optimization"] > 1.5
+
+
+def test_skipped_step_recovers_once_upstream_is_fast(stub_client, resume, monkeypatch):
+    monkeypatch.setattr(main, "STEP_ESTIMATE_HALF_LIFE", 0.5)
+    stub_client.app.state.delays["optimization"] = 3.0
+
+    async def run():
+        return await main._run_resume_pipeline(resume, "Python job", deadline=main.Deadline(2.0))
+
+    slow = asyncio.run(run())
+    # Straight after the timeout the raised estimate skips step 8 without calling it
+    skipped = asyncio.run(run())
+    stub_client.app.state.delays["optimization"] = 0.0
+    time.sleep(1.5)
+    recovered = asyncio.run(run())
+    again = asyncio.run(run())
+
+    assert [slow["degraded"], skipped["degraded"]] == ["optimization", "optimization"]
+    assert recovered["degraded"] is None and again["degraded"] is None
+    steps = [call["step"] for call in stub_client.app.state.calls]
+    assert steps.count("optimization") == 3
+    assert main.STEP_LATENCY_ESTIMATES["optimization"] < 1.0
+
+
+def test_repeated_timeouts_do_not_compound(monkeypatch):
+    monkeypatch.setattr(main, "STEP_LATENCY_ESTIMATES", {})
+    monkeypatch.setattr(main, "STEP_LATENCY_OBSERVED_AT", {})
+    monkeypatch.setattr(main, "MAX_STEP_LATENCY", 5.0)
+
+    for _ in range(3):
+        main._record_step_timeout("optimization", 1.0)
+    assert main.STEP_LATENCY_ESTIMATES["optimization"] == 1.5
+
+    main._record_step_timeout("optimization", 10.0)
+    assert main.STEP_LATENCY_ESTIMATES["optimization"] == 5.0
+
+
+def test_transient_error_is_retried_within_budget(stub_client, resume):
+    stub_client.app.state.failures["job_analysis"] = [429]
+
+    result, _ = _timed(
+        main._run_resume_pipeline(resume, "Python job", deadline=main.Deadline(10.0))
+    )
+
+    assert result["degraded"] is None
+    steps = [call["step"] for call in stub_client.app.state.calls]
+    assert steps.count("job_analysis") == 2
+
+
+def test_no_retry_when_budget_cannot_cover_another_attempt(stub_client, resume, monkeypatch):
+    stub_client.app.state.failures["job_analysis"] = [503]
+    monkeypatch.setitem(main.STEP_LATENCY_ESTIMATES, "job_analysis", 0.5)
+
+    with pytest.raises(main.DeadlineExceeded, match="no budget left to retry"):
+        asyncio.run(main._run_resume_pipeline(resume, "Python job", deadline=main.Deadline(1.0)))
+
+    assert len(stub_client.app.state.calls) == 1
+
+
+def test_without_deadline_nothing_degrades(stub_client, resume):
+    stub_client.app.state.delays["optimization"] = 0.3
+
+    result, _ = _timed(main._run_resume_pipeline(resume, "Python job"))
+
+    assert result["degraded"] is None
+
+
+def test_deadline_header_and_query_are_accepted(api, resume):
+    body = {"resume": resume, "jobDescription": "Python job"}
+
+    by_header = api.post("/optimize", json=body, headers={"X-Deadline-Ms": "10000"})
+    by_query = api.post("/optimize?deadline_ms=10000", json=body)
+
+    for response in (by_header, by_query):
+        assert response.status_code == 200
+        assert "X-Resume-Degraded" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "query, headers, status",
+    [
+        ("", {"X-Deadline-Ms": "abc"}, 400),
+        ("", {"X-Deadline-Ms": "0"}, 400),
+        ("?deadline_ms=-5", {}, 400),
+        ("?deadline_ms=abc", {}, 422),
+    ],
+)
+def test_invalid_deadline_is_rejected(api, stub_client, resume, query, headers, status):
+    response = api.post(
+        f"/optimize{query}", json={"resume": resume, "jobDescription": "Python job"}, headers=headers
+    )
+
+    assert response.status_code == status
+    assert _steps(stub_client) == []
+
+
+def test_slow_early_step_returns_504(api, stub_client, resume):
+    stub_client.app.state.delays["job_analysis"] = 2.0
+
+    response = api.post(
+        "/optimize", json={"resume": resume, "jobDescription": "Python job"}, headers={"X-Deadline-Ms": "500"}
+    )
+
+    assert response.status_code == 504
+    assert _steps(stub_client) == ["job_analysis"]
+
+
+def test_degraded_response_has_header(api, stub_client, resume):
+    stub_client.app.state.delays["optimization"] = 2.0
+
+    response = api.post(
+        "/optimize?plain=true",
+        json={"resume": resume, "jobDescription": "Python job"},
+        headers={"X-Deadline-Ms": "1000"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Resume-Degraded"] == "optimization"
+    assert response.text.startswith("Alex Morgan\n")
+
+
+def test_client_disconnect_cancels_pipeline(stub_client, resume, monkeypatch):
+    from stub_server import BackgroundStub
+
+    monkeypatch.setenv("OPENAI_BASE_URL", stub_client.base_url)
+    monkeypatch.setattr(main, "POOL_SETTINGS", PoolSettings(warm_connections=0, rewarm_after=0))
+    stub_client.app.state.delays["experience"] = 1.0
+    body = json.dumps({"resume": resume, "jobDescription": "Python job"}).encode("utf-8")
+
+    with BackgroundStub(main.app) as server:
+        address = urlparse(server.base_url)
+        with socket.create_connection((address.hostname, address.port)) as sock:
+            sock.sendall(
+                b"POST /optimize HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                + body
+            )
+            while "experience" not in _steps(stub_client):
+                time.sleep(0.01)
+        # Give the pipeline time to notice and to run later steps if it was not cancelled
+        time.sleep(2.0)
+
+    assert _steps(stub_client) == ["job_analysis", "resume_matching", "summary_skills", "experience"]
@@ -0,0 +1,77 @@
+import main
+
+
+def _upload(api, text):
+    response = api.post("/upload/", files={"file": ("resume.txt", text.encode("utf-8"), "text/plain")})
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+def test_file_endpoint_returns_upload_unchanged(api):
+    raw = "\ufeffJane Doe\r\n**Summary:**\r\nBackend engineer\r\n"
+
+    file_id = _upload(api, raw)
+
+    assert api.get(f"/file/{file_id}").json()["content"] == raw
+
+
+def test_optimize_by_file_id_matches_inline_resume(api, read_fixture):
+    resume = read_fixture("resume_full.txt")
+    file_id = _upload(api, resume)
+
+    by_id = api.post("/optimize", json={"file_id": file_id, "jobDescription": "Python job"})
+    inline = api.post("/optimize", json={"resume": resume, "jobDescription": "Python job"})
+
+    assert by_id.status_code == 200
+    assert by_id.json() == inline.json()
+
+
+def test_analyze_accepts_file_id_form_field(api, read_fixture):
+    file_id = _upload(api, read_fixture("resume_full.txt"))
+
+    response = api.post(
+        "/analyze/",
+        data={"file_id": file_id},
+        files={"job": ("job.txt", read_fixture("job.txt").encode("utf-8"), "text/plain")},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["optimized_resume"].startswith("Alex Morgan\n")
+
+
+def test_stored_parse_is_reused(api, read_fixture, monkeypatch):
+    file_id = _upload(api, read_fixture("resume_full.txt"))
+    calls = []
+    parse = main.parse_resume
+    monkeypatch.setattr(main, "parse_resume", lambda text: calls.append(text) or parse(text))
+
+    api.post("/optimize", json={"file_id": file_id, "jobDescription": "Python job"})
+    api.post("/optimize", json={"file_id": file_id, "jobDescription": "Go job"})
+
+    assert calls == []
+
+
+def test_local_assembly_copies_cached_projects(read_fixture, monkeypatch):
+    parsed = main.parse_resume(read_fixture("resume_full.txt"))
+    joined = {}
+    join = main._join_sections
+    monkeypatch.setattr(main, "_join_sections", lambda pre, secs: joined.update(secs) or join(pre, secs))
+
+    main.assemble_resume_locally(
+        parsed, "SUMMARY\nBackend engineer\n\nSKILLS\n- Python", "EXPERIENCE\n- Built APIs", "", ""
+    )
+
+    cached = dict(parsed.sections)["PROJECTS"]
+    assert joined["PROJECTS"] == cached
+    assert joined["PROJECTS"] is not cached
+
+
+def test_unknown_file_id_is_404(api):
+    assert api.post("/optimize", json={"file_id": "missing", "jobDescription": "x"}).status_code == 404
+    assert api.post("/analyze/", data={"file_id": "missing", "job_url": "http://x"}).status_code == 404
+    assert api.get("/file/missing").status_code == 404
+
+
+def test_missing_resume_and_file_id_is_400(api):
+    assert api.post("/optimize", json={"jobDescription": "x"}).status_code == 400
+    assert api.post("/analyze/", data={"job_url": "http://x"}).status_code == 400
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import main
+
+JOB_BODY = (
+    b"<div data-testid='job-detail-page__job-body'>"
+    b"<div>Responsibilities &amp; duties</div><br><p>How to apply</p></div>"
+)
+
+
+class _ChunkedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chunks_after_body = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n" % len(data) + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        charset = "utf8mb4" if self.path == "/odd-charset" else "utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", f"text/html; charset={charset}")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if self.path in ("/job", "/odd-charset"):
+                self._chunk(b"<html><head><style>.a{}</style>")
+                self._chunk(b"<script>var x = '<div>';</script></head><body>")
+                self._chunk(JOB_BODY)
+                # Endless trailer: the client must stop after the body closes
+                while True:
+                    type(self).chunks_after_body += 1
+                    self._chunk(b"<p>footer</p>" * 100)
+                    time.sleep(0.01)
+            elif self.path == "/huge":
+                while True:
+                    self._chunk(b"<script>" + b"x" * 60000 + b"</script>")
+            elif self.path == "/drip":
+                while True:
+                    self._chunk(b"<p>a</p>")
+                    time.sleep(0.2)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChunkedHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_stops_after_job_body_and_strips_scripts(server_url):
+    _ChunkedHandler.chunks_after_body = 0
+    html = asyncio.run(main.fetch_job_html(server_url + "/job", timeout=5))
+
+    assert "<script" not in html and "<style" not in html
+    assert html.endswith("</div>")
+    assert "footer" not in html
+    assert _ChunkedHandler.chunks_after_body < 5
+    assert main.extract_job_text_flexibly(html) == "Responsibilities & duties\nHow to apply"
+
+
+def test_byte_cap_truncates_huge_body(server_url):
+    started = time.monotonic()
+    html = asyncio.run(main.fetch_job_html(server_url + "/huge", max_bytes=200_000, timeout=5))
+
+    assert html == ""  # everything read so far was script content
+    assert time.monotonic() - started < 2
+
+
+def test_total_timeout_bounds_slow_drip(server_url):
+    started = time.monotonic()
+    with pytest.raises(ValueError, match="Timed out"):
+        asyncio.run(main.fetch_job_html(server_url + "/drip", timeout=1))
+    assert time.monotonic() - started < 2
+
+
+def test_unknown_charset_falls_back_to_utf8(server_url):
+    html = asyncio.run(main.fetch_job_html(server_url + "/odd-charset", timeout=5))
+
+    assert "Responsibilities" in html
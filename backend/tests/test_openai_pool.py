@@ -0,0 +1,27 @@
+import asyncio
+
+import main
+from openai_client import ConnectionStats, PoolSettings
+
+
+def test_warm_pool_is_reused_by_pipeline(stub, monkeypatch, read_fixture):
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.base_url)
+    monkeypatch.setattr(main, "client", None)
+    monkeypatch.setattr(main, "connection_stats", ConnectionStats())
+    monkeypatch.setattr(main, "POOL_SETTINGS", PoolSettings(warm_connections=2, rewarm_after=0))
+    resume = read_fixture("resume_full.txt")
+
+    async def run():
+        async with main.lifespan(main.app):
+            warm = main.connection_stats.as_dict()
+            for _ in range(2):
+                await main._run_resume_pipeline(resume, "Python job")
+            return warm, main.connection_stats.as_dict()
+
+    warm, after = asyncio.run(run())
+
+    assert warm["warmup_connections"] == 2 and warm["requests"] == 0
+    assert after["requests"] == 14
+    assert after["new_connections"] == 0
+    assert after["reuse_rate"] == 1.0
+    assert main.client is None  # closed on shutdown
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from step_config import DEFAULT_STEP_CONFIGS, StepConfig, list_profiles, load_step_configs
+
+STEP_ENV_VARS = [
+    f"STEP_{step.upper()}_{field}"
+    for step in DEFAULT_STEP_CONFIGS
+    for field in ("MODEL", "MAX_COMPLETION_TOKENS", "REASONING_EFFORT")
+]
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in STEP_ENV_VARS + ["STEP_CONFIG_FILE", "STEP_PROFILE"]:
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write(data) -> str:
+        path = tmp_path / "steps.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return str(path)
+
+    return write
+
+
+def test_defaults_without_file_or_env():
+    assert load_step_configs() == DEFAULT_STEP_CONFIGS
+
+
+def test_top_level_file_overrides_only_named_fields(write_config):
+    path = write_config({"experience": {"model": "gpt-5-mini", "max_completion_tokens": "3000"}})
+
+    configs = load_step_configs(path)
+
+    assert configs["experience"] == StepConfig(model="gpt-5-mini", max_completion_tokens=3000)
+    assert configs["education"] == DEFAULT_STEP_CONFIGS["education"]
+
+
+def test_file_and_profile_from_env(write_config, monkeypatch):
+    path = write_config({"profiles": {"fast": {"optimization": {"reasoning_effort": "low"}}}})
+    monkeypatch.setenv("STEP_CONFIG_FILE", path)
+    monkeypatch.setenv("STEP_PROFILE", "fast")
+
+    configs = load_step_configs()
+
+    assert configs["optimization"].reasoning_effort == "low"
+    assert list_profiles(path) == ["fast"]
+
+
+def test_unknown_profile_raises(write_config):
+    path = write_config({"profiles": {"fast": {}}})
+
+    with pytest.raises(ValueError, match="Unknown step profile: slow"):
+        load_step_configs(path, "slow")
+
+
+def test_env_takes_precedence_over_file(write_config, monkeypatch):
+    path = write_config({"education": {"model": "gpt-5-mini", "reasoning_effort": "low"}})
+    monkeypatch.setenv("STEP_EDUCATION_MODEL", "gpt-5")
+    monkeypatch.setenv("STEP_EDUCATION_MAX_COMPLETION_TOKENS", "500")
+
+    cfg = load_step_configs(path)["education"]
+
+    assert cfg == StepConfig(model="gpt-5", max_completion_tokens=500, reasoning_effort="low")
+
+
+def test_null_clears_a_default(write_config):
+    path = write_config({"education": {"max_completion_tokens": None, "reasoning_effort": None}})
+
+    cfg = load_step_configs(path)["education"]
+
+    assert cfg.max_completion_tokens is None and cfg.reasoning_effort is None
+    assert cfg.request_kwargs() == {"model": "gpt-5-nano"}
+
+
+def test_unknown_step_raises(write_config):
+    with pytest.raises(ValueError, match="Unknown pipeline step: formatting"):
+        load_step_configs(write_config({"formatting": {"model": "gpt-5"}}))
+
+
+def test_unknown_key_raises(write_config):
+    with pytest.raises(ValueError, match="Unknown step config keys: temperature"):
+        load_step_configs(write_config({"education": {"temperature": 0.2}}))
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import main
+import stub_server
+from step_config import StepConfig
+
+MESSAGES = [
+    {"role": "system", "content": stub_server.ResumePrompts.job_description_analysis_prompt},
+    {"role": "user", "content": "Job:\nPython developer"},
+]
+
+
+def test_step_capped_by_reasoning_is_retried_without_cap(stub_client):
+    configs = {"job_analysis": StepConfig(max_completion_tokens=100, reasoning_effort="medium")}
+    stats = []
+
+    response = asyncio.run(
+        main._chat_step("job_analysis", MESSAGES, step_configs=configs, stats=stats)
+    )
+
+    assert response.choices[0].message.content.startswith("Job Title")
+    caps = [call.get("max_completion_tokens") for call in stub_client.app.state.calls]
+    assert caps == [100, None]
+    assert len(stats) == 2
+
+
+def test_empty_output_without_cap_raises(stub_client, monkeypatch):
+    monkeypatch.setitem(stub_server.CANNED_OUTPUT, "latex", "")
+    messages = [{"role": "system", "content": "Format as LaTeX"}, {"role": "user", "content": "x"}]
+
+    with pytest.raises(main.StepOutputError, match="empty content"):
+        asyncio.run(main._chat_step("latex", messages, step_configs={"latex": StepConfig()}))
+
+
+def test_optional_steps_may_return_nothing(stub_client, monkeypatch):
+    monkeypatch.setitem(stub_server.CANNED_OUTPUT, "certifications", "")
+    messages = [
+        {"role": "system", "content": stub_server.ResumePrompts.resume_certifications_prompt},
+        {"role": "user", "content": "Current Resume:\nJane"},
+    ]
+
+    response = asyncio.run(
+        main._chat_step("certifications", messages, step_configs={"certifications": StepConfig()})
+    )
+
+    assert response.choices[0].message.content == ""
+
+
+
+def test_stub_usage_depends_on_model(stub_client):
+    async def completion_tokens(model):
+        response = await main._chat_step(
+            "job_analysis", MESSAGES, step_configs={"job_analysis": StepConfig(model=model)}
+        )
+        return response.usage.completion_tokens
+
+    async def run():
+        return await completion_tokens("gpt-5-nano"), await completion_tokens("gpt-5")
+
+    nano, full = asyncio.run(run())
+
+    assert full > nano